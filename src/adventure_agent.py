@@ -5,22 +5,148 @@ import dotenv
 import os
 import json
 import re
+import codecs
+import hashlib
+import functools
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
 from smolagents import (
     ToolCallingAgent,
     OpenAIServerModel,
     DuckDuckGoSearchTool,
     tool
 )
+from smolagents.memory import FinalAnswerStep
 from phoenix.otel import register
 from openinference.instrumentation.smolagents import SmolagentsInstrumentor
 from bs4 import BeautifulSoup
+from lxml import etree
 
 dotenv.load_dotenv()
-register()
-SmolagentsInstrumentor().instrument()
+
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+DAILY_METRICS = ",".join([
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "precipitation_sum",
+    "precipitation_hours",
+    "weathercode",
+    "windspeed_10m_max",
+    "windgusts_10m_max",
+])
+
+CACHE_DIR = os.path.expanduser(os.getenv("ADVENTURE_AGENT_CACHE_DIR", "~/.cache/adventure_agent"))
+GEOCODE_CACHE_TTL = 30 * 24 * 60 * 60  # seconds
+# The archive fills in recent days over about five days; until then they come back as null
+ARCHIVE_LAG_DAYS = 5
+# Bump when get_weather_forecast's output format changes so cached results are not reused
+WEATHER_CACHE_VERSION = 2
+GEOCODE_MEMO_SIZE = 128
+MAX_PAGE_BYTES = 256 * 1024  # visit_webpage only keeps ~5k chars of text
+MAX_PAGE_CHARS = 5000
+MAX_CONCURRENT_FETCHES = 8
+
+# Shared session so repeat calls reuse keep-alive connections to the same host
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate',
+})
+# Arbitrary pages get a single retry for dropped connections and none for error statuses.
+# Retry-After is ignored everywhere: urllib3 would otherwise sleep up to six hours on a 429.
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=1, backoff_factor=0.2, respect_retry_after_header=False),
+)
+# Open-Meteo's endpoints are idempotent and briefly rate limited, so they also retry 429/5xx
+_API_ADAPTER = HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        connect=1,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=False,
+    ),
+)
+_SESSION.mount("https://", _HTTP_ADAPTER)
+_SESSION.mount("http://", _HTTP_ADAPTER)
+_SESSION.mount(GEOCODING_URL, _API_ADAPTER)
+_SESSION.mount(ARCHIVE_URL, _API_ADAPTER)
+
+_WS_RE = re.compile(r"\s+")
+_PAREN_RE = re.compile(r"\([^)]*\)")
+
+def _cache_key(*parts: str) -> str:
+    """Builds a stable cache key from the given parts."""
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+def _open_cache() -> sqlite3.Connection:
+    """Opens the on-disk tool cache, creating it on first use."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(CACHE_DIR, "cache.sqlite3"), timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cache ("
+        "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL, "
+        "PRIMARY KEY (namespace, key))"
+    )
+    return conn
+
+def _cache_get(namespace: str, key: str) -> Optional[str]:
+    """Returns the cached value for key, or None when missing or expired.
+
+    Cache failures are treated as misses so tools fall back to the network.
+    """
+    try:
+        with closing(_open_cache()) as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+
+    if row is None:
+        return None
+    value, expires_at = row
+    if expires_at is not None and expires_at < time.time():
+        return None
+    return value
+
+def _cache_set(namespace: str, key: str, value: str, ttl: Optional[float] = None) -> None:
+    """Stores value under key; entries without a ttl never expire."""
+    expires_at = time.time() + ttl if ttl is not None else None
+    try:
+        with closing(_open_cache()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, value, expires_at),
+            )
+    except (sqlite3.Error, OSError):
+        pass
+
+# One search tool instance is shared by adventure_search and the planner
+_DDG = DuckDuckGoSearchTool()
+
+@functools.lru_cache(maxsize=256)
+def _cached_search(normalized_query: str) -> str:
+    """Runs a DuckDuckGo search, memoizing results for the life of the process.
+
+    Failed searches raise and are therefore never cached.
+    """
+    return _DDG(normalized_query)
 
 @tool
 def adventure_search(destination: str, activities: Optional[str] = None, days: int = 3) -> str:
@@ -37,57 +163,155 @@ def adventure_search(destination: str, activities: Optional[str] = None, days: i
     try:
         # Build targeted search query
         activity_terms = activities if activities else "adventure activities outdoor"
-        query_parts = [destination, activity_terms]
+        itinerary_terms = f" {days} day itinerary" if days > 1 else ""
+        search_query = f"{destination} {activity_terms}{itinerary_terms} travel guide things to do"
         
-        if days > 1:
-            query_parts.append(f"{days} day itinerary")
-        
-        query_parts.extend(["travel guide", "things to do"])
-        search_query = " ".join(query_parts)
-        
-        # Use DuckDuckGo search
-        search_tool = DuckDuckGoSearchTool()
-        results = search_tool(search_query)
+        # Use DuckDuckGo search; the engine ignores case and spacing, so share cache entries
+        results = _cached_search(" ".join(search_query.lower().split()))
         
         return f"Search results for '{search_query}':\n{results}"
         
     except Exception as e:
         return f"Error performing adventure search: {str(e)}"
 
-@tool
-def visit_webpage(url: str) -> str:
-    """Visits a webpage at the given URL and returns clean text content.
+_SKIPPED_TAGS = frozenset({"script", "style", "nav", "footer", "header"})
+# Only block-level boundaries separate words; inline tags (b, i, a, span, ...) join their text
+_BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "body", "br", "caption", "dd", "div", "dl",
+    "dt", "figcaption", "figure", "form", "h1", "h2", "h3", "h4", "h5", "h6", "head", "hr",
+    "html", "li", "main", "ol", "option", "p", "pre", "section", "table", "td", "th",
+    "title", "tr", "ul",
+})
+
+class _VisibleTextCollector:
+    """lxml parser target that gathers visible text until a character budget is reached."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.parts: List[str] = []
+        self.length = 0
+        self.skip_depth = 0
+        self.at_space = True
+
+    @property
+    def done(self) -> bool:
+        return self.length > self.limit
+
+    def _append(self, text: str) -> None:
+        # Budget by the whitespace-collapsed length, which is what visit_webpage returns.
+        # Text nodes may arrive split across feed() chunks, so keep them verbatim.
+        collapsed = _WS_RE.sub(" ", text)
+        if self.at_space and collapsed.startswith(" "):
+            collapsed = collapsed[1:]
+        if collapsed:
+            self.at_space = collapsed.endswith(" ")
+        self.parts.append(text)
+        self.length += len(collapsed)
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._append(" ")
+
+    def end(self, tag: str) -> None:
+        if tag in _SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        if tag in _BLOCK_TAGS:
+            self._append(" ")
+
+    def data(self, data: str) -> None:
+        if self.skip_depth or self.done:
+            return
+        self._append(data)
+
+    def close(self) -> str:
+        return "".join(self.parts)
+
+def _soup_text(content: bytes) -> str:
+    """Extracts visible text from a complete HTML document with BeautifulSoup."""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(list(_SKIPPED_TAGS)):
+        script.decompose()
+
+    # Separate block-level elements the same way _VisibleTextCollector does
+    for block in soup(list(_BLOCK_TAGS)):
+        block.insert_before(" ")
+        block.insert_after(" ")
+
+    return soup.get_text()
+
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset\s*=", re.IGNORECASE)
+
+def _sniff_encoding(head: bytes) -> Optional[str]:
+    """Picks the parser encoding for a page whose Content-Type names no charset.
+
+    libxml2 honours a BOM or a <meta> charset itself but otherwise assumes Latin-1,
+    while undeclared pages are nearly always UTF-8.
 
     Args:
-        url: The URL of the webpage to visit.
+        head: The first chunk of the response body.
 
     Returns:
-        The clean text content of the webpage, or an error message if the request fails.
+        None to let libxml2 use the page's own declaration, otherwise "utf-8".
     """
+    if head.startswith((codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return None
+    if _META_CHARSET_RE.search(head):
+        return None
+    return "utf-8"
+
+def _extract_page_text(response: requests.Response) -> Tuple[str, bool]:
+    """Streams an HTML response into clean text, stopping once enough text is gathered.
+
+    Args:
+        response: A streamed (``stream=True``) response whose status was already checked.
+
+    Returns:
+        The whitespace-collapsed visible text and whether the page was cut short.
+    """
+    content_type = response.headers.get('Content-Type', '').lower()
+    encoding = response.encoding if 'charset=' in content_type else None
+    collector = _VisibleTextCollector(MAX_PAGE_CHARS)
+
+    content = bytearray()
+    chunks = response.iter_content(chunk_size=64 * 1024)
+    parser: Optional[etree.HTMLParser] = None
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Parse HTML and extract clean text
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-        
-        # Get text and clean it up
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        clean_text = ' '.join(chunk for chunk in chunks if chunk)
-        
+        for chunk in chunks:
+            content += chunk
+            if parser is None:
+                # Charsets libxml2 does not know raise LookupError here or on the first feed()
+                parser = etree.HTMLParser(target=collector, encoding=encoding or _sniff_encoding(chunk))
+            parser.feed(chunk)
+            if collector.done or len(content) >= MAX_PAGE_BYTES:
+                break
+        text = parser.close() if parser is not None else ""
+    except (etree.LxmlError, LookupError):
+        # Markup libxml2 cannot stream falls back to a full parse with the stdlib html.parser
+        for chunk in chunks:
+            if len(content) >= MAX_PAGE_BYTES:
+                break
+            content += chunk
+        text = _soup_text(bytes(content[:MAX_PAGE_BYTES]))
+
+    clean_text = _WS_RE.sub(" ", text).strip()
+    return clean_text, collector.done or len(clean_text) > MAX_PAGE_CHARS
+
+def _visit_page(url: str) -> str:
+    """Fetches a single page and returns its clean text or an error message."""
+    try:
+        # Stream the body and parse as it arrives; stop once enough text is collected
+        with _SESSION.get(url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            clean_text, truncated = _extract_page_text(response)
+
         # Truncate if too long
-        if len(clean_text) > 5000:
-            clean_text = clean_text[:5000] + "... [truncated]"
-        
+        if truncated:
+            clean_text = clean_text[:MAX_PAGE_CHARS] + "... [truncated]"
+
         return clean_text
 
     except RequestException as e:
@@ -95,6 +319,57 @@ def visit_webpage(url: str) -> str:
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
 
+@tool
+def visit_webpage(url: str) -> str:
+    """Visits a webpage at the given URL and returns clean text content.
+
+    Args:
+        url: The URL of the webpage to visit.
+
+    Returns:
+        The clean text content of the webpage, or an error message if the request fails.
+    """
+    return _visit_page(url)
+
+@tool
+def visit_webpages(urls: List[str]) -> str:
+    """Visits several webpages concurrently and returns the clean text content of each.
+
+    Args:
+        urls: The URLs of the webpages to visit.
+
+    Returns:
+        The clean text of every page under a "=== <url> ===" heading, in the order given.
+        Pages that fail to load show an error message instead of their text.
+    """
+    if not urls:
+        return "Error: No URLs provided."
+
+    with ThreadPoolExecutor(max_workers=min(len(urls), MAX_CONCURRENT_FETCHES)) as executor:
+        pages = list(executor.map(_visit_page, urls))
+
+    return "\n\n".join(f"=== {url} ===\n{page}" for url, page in zip(urls, pages))
+
+# Resolved coordinates per raw location string, most recently used last
+_GEOCODE_MEMO: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_GEOCODE_MEMO_LOCK = threading.Lock()
+
+def _recall_geocode(location: str) -> Optional[Dict[str, Any]]:
+    """Returns the remembered geocoding result for a location, if any."""
+    with _GEOCODE_MEMO_LOCK:
+        result = _GEOCODE_MEMO.get(location)
+        if result is not None:
+            _GEOCODE_MEMO.move_to_end(location)
+        return result
+
+def _remember_geocode(location: str, result: Dict[str, Any]) -> None:
+    """Remembers a geocoding result, evicting the least recently used entry when full."""
+    with _GEOCODE_MEMO_LOCK:
+        _GEOCODE_MEMO[location] = result
+        _GEOCODE_MEMO.move_to_end(location)
+        if len(_GEOCODE_MEMO) > GEOCODE_MEMO_SIZE:
+            _GEOCODE_MEMO.popitem(last=False)
+
 @tool
 def get_weather_forecast(location: str, start_date: str, end_date: str) -> str:
     """Gets historical weather data for a location and date range.
@@ -127,17 +402,32 @@ def get_weather_forecast(location: str, start_date: str, end_date: str) -> str:
         if end > today:
             end = today
 
-        normalized_start = start.strftime("%Y-%m-%d")
-        normalized_end = end.strftime("%Y-%m-%d")
+        normalized_start = start.isoformat()
+        normalized_end = end.isoformat()
+
+        # Archive data for a range that ended before the archive's lag window no longer changes.
+        weather_cache_key: Optional[str] = None
+        if end < today - timedelta(days=ARCHIVE_LAG_DAYS):
+            weather_cache_key = _cache_key(
+                str(WEATHER_CACHE_VERSION),
+                DAILY_METRICS,
+                # Raw location: the cached result echoes it back as original_query
+                location,
+                normalized_start,
+                normalized_end,
+            )
+            cached_forecast = _cache_get("weather", weather_cache_key)
+            if cached_forecast is not None:
+                return cached_forecast
 
         def generate_location_candidates(raw_location: str) -> List[str]:
-            cleaned = re.sub(r"\s+", " ", raw_location).strip()
+            cleaned = _WS_RE.sub(" ", raw_location).strip()
             candidates: List[str] = []
 
             if cleaned:
                 candidates.append(cleaned)
 
-            no_parentheses = re.sub(r"\([^)]*\)", "", cleaned).strip()
+            no_parentheses = _PAREN_RE.sub("", cleaned).strip()
             if no_parentheses and no_parentheses not in candidates:
                 candidates.append(no_parentheses)
 
@@ -168,31 +458,46 @@ def get_weather_forecast(location: str, start_date: str, end_date: str) -> str:
             return candidates
 
         def geocode(candidate: str) -> Optional[Dict[str, Any]]:
-            geocode_url = "https://geocoding-api.open-meteo.com/v1/search"
-            response = requests.get(
-                geocode_url,
+            geocode_cache_key = _cache_key(candidate.strip().lower())
+            cached_result = _cache_get("geocode", geocode_cache_key)
+            if cached_result is not None:
+                return json.loads(cached_result)
+
+            response = _SESSION.get(
+                GEOCODING_URL,
                 params={"name": candidate, "count": 5},
                 timeout=10
             )
             response.raise_for_status()
             data = response.json()
             results = data.get('results') or []
-            return results[0] if results else None
+            if not results:
+                return None
+            _cache_set("geocode", geocode_cache_key, json.dumps(results[0]), ttl=GEOCODE_CACHE_TTL)
+            return results[0]
 
-        geo_result: Optional[Dict[str, Any]] = None
+        geo_result: Optional[Dict[str, Any]] = _recall_geocode(location)
         last_error: Optional[Exception] = None
 
-        for candidate in generate_location_candidates(location):
-            try:
-                geo_result = geocode(candidate)
-                if geo_result:
-                    break
-            except RequestException as geo_exc:
-                last_error = geo_exc
-                continue
-            except Exception as geo_exc:  # pragma: no cover - unexpected but handled gracefully
-                last_error = geo_exc
-                continue
+        if geo_result is None:
+            # Candidates are independent lookups, so issue them concurrently and
+            # keep the first hit in candidate (priority) order.
+            candidates = generate_location_candidates(location)
+            with ThreadPoolExecutor(max_workers=max(len(candidates), 1)) as executor:
+                lookups = [executor.submit(geocode, candidate) for candidate in candidates]
+
+            for lookup in lookups:
+                try:
+                    geo_result = lookup.result()
+                    if geo_result:
+                        _remember_geocode(location, geo_result)
+                        break
+                except RequestException as geo_exc:
+                    last_error = geo_exc
+                    continue
+                except Exception as geo_exc:  # pragma: no cover - unexpected but handled gracefully
+                    last_error = geo_exc
+                    continue
 
         if not geo_result:
             if last_error:
@@ -203,26 +508,16 @@ def get_weather_forecast(location: str, start_date: str, end_date: str) -> str:
         lon = geo_result['longitude']
         
         # Get historical weather data
-        weather_url = "https://archive-api.open-meteo.com/v1/archive"
-        daily_metrics = [
-            "temperature_2m_max",
-            "temperature_2m_min",
-            "precipitation_sum",
-            "precipitation_hours",
-            "weathercode",
-            "windspeed_10m_max",
-            "windgusts_10m_max",
-        ]
         weather_params = {
             "latitude": lat,
             "longitude": lon,
             "start_date": normalized_start,
             "end_date": normalized_end,
-            "daily": ",".join(daily_metrics),
+            "daily": DAILY_METRICS,
             "timezone": "auto",
         }
 
-        weather_response = requests.get(weather_url, params=weather_params, timeout=10)
+        weather_response = _SESSION.get(ARCHIVE_URL, params=weather_params, timeout=10)
         weather_response.raise_for_status()
         weather_data = weather_response.json()
         
@@ -233,18 +528,21 @@ def get_weather_forecast(location: str, start_date: str, end_date: str) -> str:
         if not dates:
             return "Error: No historical weather data available for the requested dates."
 
-        def safe_daily_value(key: str, index: int, default: Optional[Any] = None) -> Optional[Any]:
+        day_count = len(dates)
+
+        def daily_column(key: str) -> List[Optional[Any]]:
+            # Fetch each metric once and pad/trim it to line up with `dates`.
             values = daily_data.get(key)
-            if isinstance(values, list) and index < len(values):
-                return values[index]
-            return default
+            if not isinstance(values, list):
+                return [None] * day_count
+            return values[:day_count] + [None] * (day_count - len(values))
 
-        def safe_daily_any(keys: List[str], index: int, default: Optional[Any] = None) -> Optional[Any]:
-            for key in keys:
-                value = safe_daily_value(key, index, None)
-                if value is not None:
-                    return value
-            return default
+        def daily_column_any(*keys: str) -> List[Optional[Any]]:
+            columns = [daily_column(key) for key in keys]
+            return [
+                next((value for value in row if value is not None), None)
+                for row in zip(*columns)
+            ]
 
         country = geo_result.get('country') or geo_result.get('country_code', '') or ''
         location_label = f"{geo_result.get('name', location)}, {country}".strip(', ')
@@ -257,56 +555,178 @@ def get_weather_forecast(location: str, start_date: str, end_date: str) -> str:
             'data_type': 'historical',
             'date_range': {
                 'requested': {
-                    'start_date': requested_start.strftime("%Y-%m-%d"),
-                    'end_date': requested_end.strftime("%Y-%m-%d"),
+                    'start_date': requested_start.isoformat(),
+                    'end_date': requested_end.isoformat(),
                 },
                 'resolved': {
                     'start_date': normalized_start,
                     'end_date': normalized_end,
                 },
             },
-            'forecast': []
+            'forecast': [
+                {
+                    'date': date,
+                    'temp_max': temp_max,
+                    'temp_min': temp_min,
+                    'precipitation_sum': precipitation_sum,
+                    'precipitation_hours': precipitation_hours,
+                    'precipitation_probability': precipitation_probability,
+                    'weather_code': weather_code,
+                    'wind_speed_max': wind_speed_max,
+                    'wind_gusts_max': wind_gusts_max,
+                }
+                for (
+                    date, temp_max, temp_min, precipitation_sum, precipitation_hours,
+                    precipitation_probability, weather_code, wind_speed_max, wind_gusts_max,
+                ) in zip(
+                    dates,
+                    daily_column('temperature_2m_max'),
+                    daily_column('temperature_2m_min'),
+                    daily_column('precipitation_sum'),
+                    daily_column('precipitation_hours'),
+                    daily_column_any('precipitation_probability_mean', 'precipitation_probability_max'),
+                    daily_column_any('weathercode', 'weather_code'),
+                    daily_column('windspeed_10m_max'),
+                    daily_column('windgusts_10m_max'),
+                )
+            ]
         }
-        
-        for i, date in enumerate(dates):
-            day_forecast = {
-                'date': date,
-                'temp_max': safe_daily_value('temperature_2m_max', i),
-                'temp_min': safe_daily_value('temperature_2m_min', i),
-                'precipitation_sum': safe_daily_value('precipitation_sum', i),
-                'precipitation_hours': safe_daily_value('precipitation_hours', i),
-                'precipitation_probability': safe_daily_any(['precipitation_probability_mean', 'precipitation_probability_max'], i),
-                'weather_code': safe_daily_any(['weathercode', 'weather_code'], i),
-                'wind_speed_max': safe_daily_value('windspeed_10m_max', i),
-                'wind_gusts_max': safe_daily_value('windgusts_10m_max', i),
-            }
-            forecast_summary['forecast'].append(day_forecast)
-        
-        return json.dumps(forecast_summary, indent=2)
+
+        result = json.dumps(forecast_summary, separators=(",", ":"))
+        # Days the archive has not filled in yet must be fetched again next time
+        complete = all(
+            value is not None
+            for metric in DAILY_METRICS.split(",")
+            for value in daily_column(metric)
+        )
+        if weather_cache_key is not None and complete:
+            _cache_set("weather", weather_cache_key, result)
+        return result
         
     except RequestException as e:
         return f"Error fetching weather data: {str(e)}"
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
 
+_WEATHER_CATEGORY_NAMES = {
+    "C": "clear",
+    "F": "fog",
+    "D": "drizzle",
+    "R": "rain",
+    "H": "rain_showers",
+    "S": "snow",
+    "T": "thunderstorm",
+    "?": "unknown",
+}
+_SEVERE_WEATHER_CATEGORIES = frozenset({"snow", "rain_showers", "thunderstorm"})
+
+def _build_weather_code_table() -> bytearray:
+    """Maps every WMO weather code (0-99) to a one-letter category."""
+    table = bytearray(b"?" * 100)
+    for codes, category in (
+        (range(0, 4), b"C"),
+        ((45, 48), b"F"),
+        (range(51, 58), b"D"),
+        (range(61, 68), b"R"),
+        (range(71, 78), b"S"),
+        (range(80, 83), b"H"),
+        ((85, 86), b"S"),
+        (range(95, 100), b"T"),
+    ):
+        for code in codes:
+            table[code] = category[0]
+    return table
+
+_WEATHER_CODE_TABLE = _build_weather_code_table()
+
+def _weather_category(code: Any) -> str:
+    """Returns the category name for one WMO code; None, non-numeric or out-of-range is "unknown"."""
+    try:
+        index = int(code)
+    except (TypeError, ValueError):
+        return "unknown"
+    if not 0 <= index < len(_WEATHER_CODE_TABLE):
+        return "unknown"
+    return _WEATHER_CATEGORY_NAMES[chr(_WEATHER_CODE_TABLE[index])]
+
+@tool
+def classify_weather(codes: List[int]) -> str:
+    """Classifies daily WMO weather codes (the weather_code values from get_weather_forecast).
+
+    Args:
+        codes: WMO weather codes to classify, one per day.
+
+    Returns:
+        Compact JSON with the category of each code (clear, fog, drizzle, rain, rain_showers,
+        snow, thunderstorm or unknown), a count per category, and the number of severe days
+        (snow, rain showers or thunderstorms). Codes that do not convert to an integer 0-99
+        are "unknown"; an error message is returned if codes is not a list.
+    """
+    if not isinstance(codes, (list, tuple)):
+        return "Error: codes must be a list of WMO weather codes."
+
+    categories = [_weather_category(code) for code in codes]
+    summary = {
+        'categories': categories,
+        'counts': dict(Counter(categories)),
+        'severe_days': sum(category in _SEVERE_WEATHER_CATEGORIES for category in categories),
+    }
+    return json.dumps(summary, separators=(",", ":"))
+
 model_id="gemini-2.5-flash"
-model = OpenAIServerModel(model_id=model_id,
-                          api_base="https://generativelanguage.googleapis.com/v1beta/openai/",
-                          api_key=os.getenv("GEMINI_API_KEY"),
-                          )
-
-adventure_planner = ToolCallingAgent(
-    tools=[DuckDuckGoSearchTool(), adventure_search, visit_webpage, get_weather_forecast],
-    model=model,
-    max_steps=8,
-    name="adventure_planner",
-    description="Plans adventure trips by searching for activities, checking weather, and creating itineraries.",
-    instructions="""You are an expert adventure travel planner that creates detailed trip itineraries.
+
+@functools.lru_cache(maxsize=None)
+def enable_tracing() -> None:
+    """Registers Phoenix tracing and instruments smolagents; later calls do nothing.
+
+    Spans are exported synchronously to the local Phoenix collector, so this is not done
+    at import time: code that only uses the tools (such as the tests) stays untraced.
+    """
+    register()
+    SmolagentsInstrumentor().instrument()
+
+def build_adventure_planner(tracing: bool = True) -> ToolCallingAgent:
+    """Builds the adventure planner agent and its Gemini model client.
+
+    Construction is deferred to this function so importing the module (e.g. for the
+    tools alone) does not create an API client.
+
+    Args:
+        tracing: Whether to enable Phoenix tracing (see `enable_tracing`) for the agent.
+
+    Returns:
+        The configured adventure planner agent.
+    """
+    if tracing:
+        enable_tracing()
+
+    model = OpenAIServerModel(model_id=model_id,
+                              api_base="https://generativelanguage.googleapis.com/v1beta/openai/",
+                              api_key=os.getenv("GEMINI_API_KEY"),
+                              )
+
+    return ToolCallingAgent(
+        tools=[
+            _DDG,
+            adventure_search,
+            visit_webpage,
+            visit_webpages,
+            get_weather_forecast,
+            classify_weather,
+        ],
+        model=model,
+        max_steps=8,
+        stream_outputs=True,
+        name="adventure_planner",
+        description="Plans adventure trips by searching for activities, checking weather, and creating itineraries.",
+        instructions="""You are an expert adventure travel planner that creates detailed trip itineraries.
 
     Use ReAct reasoning to:
     1. Search for adventure activities and attractions in the destination
     2. Visit relevant webpages to gather detailed information about activities
-    3. Check weather forecasts for the travel dates
+       (use visit_webpages to read several known URLs in one step)
+    3. Check weather forecasts for the travel dates, then pass the daily weather codes to
+       classify_weather instead of interpreting the codes yourself
     4. Create a day-by-day itinerary that considers weather conditions
     5. Recommend appropriate gear and preparations
     
@@ -321,10 +741,12 @@ adventure_planner = ToolCallingAgent(
     - Suggest indoor alternatives when weather is typically poor
     
     Format your final response with clear sections: Itinerary, Weather Summary, Gear Recommendations, and Sources."""
-)
+    )
 
 def main():
     """Interactive CLI for the adventure planning agent."""
+    adventure_planner = build_adventure_planner()
+
     print("Adventure Planning Agent")
     print("========================")
     print("Ask me to plan your next adventure! Include destination, dates, and preferred activities.")
@@ -338,7 +760,12 @@ def main():
                 print("Happy travels!")
                 break
             
-            answer = adventure_planner.run(question)
+            # Model output is rendered token by token while the agent works;
+            # the final answer arrives as the last event of the stream.
+            answer = None
+            for event in adventure_planner.run(question, stream=True):
+                if isinstance(event, FinalAnswerStep):
+                    answer = event.output
             print(f"\n{answer}\n")
 
         except KeyboardInterrupt:
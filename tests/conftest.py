@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from datetime import date, datetime, time, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+from urllib.parse import parse_qs, urlparse
+import pytest
+
+DATA_DIR = Path(__file__).parent / "data"
+FROZEN_TODAY = date(2024, 6, 15)
+
+def _load_fixture(name: str) -> bytes:
+    return json.dumps(json.loads((DATA_DIR / name).read_text(encoding="utf-8"))).encode("utf-8")
+
+class OpenMeteoHandler(BaseHTTPRequestHandler):
+    """Serves canned Open-Meteo geocoding and archive responses."""
+
+    geocoding_body: bytes = _load_fixture("open_meteo_geocoding.json")
+    archive_body: bytes = _load_fixture("open_meteo_archive.json")
+    # Open-Meteo omits "results" entirely when nothing matches
+    no_results_body: bytes = b'{"generationtime_ms": 0.3}'
+    # Requests served per path; reset for every test by the `open_meteo` fixture
+    hits: Counter = Counter()
+    # Extra geocoding results by lowercased query name, registered via `open_meteo_places`
+    places: Dict[str, Dict[str, Any]] = {}
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params: Dict[str, Any] = parse_qs(url.query)
+        self.hits[url.path] += 1
+
+        if url.path == "/geocoding":
+            name = params.get("name", [""])[0].lower()
+            if name in self.places:
+                body = json.dumps({"results": [self.places[name]]}).encode("utf-8")
+            elif "chamonix" in name:
+                body = self.geocoding_body
+            else:
+                body = self.no_results_body
+        elif url.path == "/archive":
+            body = self.archive_body
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+@pytest.fixture(scope="session")
+def adventure_planner() -> Any:
+    """The planner agent, built on first use so collection, skips and `-k` subsets never create it."""
+    if not os.getenv('GEMINI_API_KEY'):
+        pytest.skip("GEMINI_API_KEY not available")
+
+    from adventure_agent import build_adventure_planner
+    return build_adventure_planner(tracing=False)
+
+@pytest.fixture(scope="session")
+def today_utc() -> date:
+    """The fixed UTC "today" used by offline tests, so date math never straddles midnight."""
+    return FROZEN_TODAY
+
+class FrozenDatetime(datetime):
+    """datetime whose now() is pinned to the start of FROZEN_TODAY (UTC)."""
+
+    @classmethod
+    def now(cls, tz: Any = None) -> "FrozenDatetime":
+        frozen = cls.combine(FROZEN_TODAY, time(), tzinfo=timezone.utc)
+        return frozen.astimezone(tz) if tz is not None else frozen.replace(tzinfo=None)
+
+@pytest.fixture
+def frozen_today(monkeypatch: pytest.MonkeyPatch, today_utc: date) -> date:
+    """Pins adventure_agent's clock to `today_utc` for the duration of a test.
+
+    Only the agent module is patched; pytest's own timing and the HTTP stack keep the real clock.
+    """
+    monkeypatch.setattr("adventure_agent.datetime", FrozenDatetime)
+    return today_utc
+
+@pytest.fixture(scope="session")
+def open_meteo_server() -> Iterator[str]:
+    """Runs a loopback Open-Meteo stand-in for the session and yields its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OpenMeteoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def open_meteo(monkeypatch: pytest.MonkeyPatch, open_meteo_server: str, tmp_path: Path) -> str:
+    """Points adventure_agent at the local Open-Meteo server with empty caches."""
+    monkeypatch.setattr("adventure_agent.GEOCODING_URL", f"{open_meteo_server}/geocoding")
+    monkeypatch.setattr("adventure_agent.ARCHIVE_URL", f"{open_meteo_server}/archive")
+    monkeypatch.setattr("adventure_agent.CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("adventure_agent._GEOCODE_MEMO", OrderedDict())
+    monkeypatch.setattr(OpenMeteoHandler, "hits", Counter())
+    return open_meteo_server
+
+@pytest.fixture
+def open_meteo_hits(open_meteo: str) -> Counter:
+    """Counts requests per path ("/geocoding", "/archive") made to the local Open-Meteo server."""
+    return OpenMeteoHandler.hits
+
+@pytest.fixture
+def open_meteo_places(monkeypatch: pytest.MonkeyPatch) -> Dict[str, Dict[str, Any]]:
+    """Returns a dict of lowercased place names to geocoding results served for the current test."""
+    places: Dict[str, Dict[str, Any]] = {}
+    monkeypatch.setattr(OpenMeteoHandler, "places", places)
+    return places
+
+@pytest.fixture
+def open_meteo_archive(monkeypatch: pytest.MonkeyPatch) -> Callable[[Dict[str, Any]], None]:
+    """Returns a function that replaces the archive payload served for the current test."""
+    def serve(payload: Dict[str, Any]) -> None:
+        monkeypatch.setattr(OpenMeteoHandler, "archive_body", json.dumps(payload).encode("utf-8"))
+    return serve
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--run-remote",
+        action="store_true",
+        default=False,
+        help="Also run tests marked `remote`, which call live external services.",
+    )
+    parser.addoption(
+        "--no-http-cache",
+        action="store_true",
+        default=False,
+        help="Bypass the on-disk HTTP response cache used by remote tests.",
+    )
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "remote: calls live external services (enable with --run-remote)")
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]) -> None:
+    if config.getoption("--run-remote"):
+        return
+    skip_remote = pytest.mark.skip(reason="calls live services; use --run-remote to run")
+    for item in items:
+        if "remote" in item.keywords:
+            item.add_marker(skip_remote)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import pytest
+import requests_cache
+from requests_cache import create_key
+
+import adventure_agent
+from adventure_agent import get_weather_forecast
+
+def _normalized_cache_key(request: Any, **kwargs: Any) -> str:
+    """Cache key that ignores case and spacing in the geocoding `name` parameter.
+
+    Commas are kept: Open-Meteo matches "Chamonix, France" differently from "Chamonix France".
+    """
+    url = urlsplit(request.url)
+    query = [
+        (key, " ".join(value.lower().split()) if key == "name" else value)
+        for key, value in parse_qsl(url.query, keep_blank_values=True)
+    ]
+    normalized = copy.copy(request)
+    normalized.url = urlunsplit(url._replace(query=urlencode(query)))
+    return create_key(normalized, **kwargs)
+
+# Module scope (not session) so the swap is undone before any offline test module runs
+@pytest.fixture(scope="module", autouse=True)
+def http_cache(
+    request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory
+) -> Iterator[Optional[requests_cache.CachedSession]]:
+    """Routes adventure_agent HTTP traffic through a SQLite-backed cache for remote runs.
+
+    Entries expire after a day. Archive requests carry the resolved end date, which is
+    clamped to today, so a range ending "today" gets a fresh key every day. Pass
+    --no-http-cache to bypass the cache entirely.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        # Keep live results out of the tool's own on-disk cache in ~/.cache
+        mp.setattr(adventure_agent, "CACHE_DIR", str(tmp_path_factory.mktemp("tool-cache")))
+
+        if request.config.getoption("--no-http-cache"):
+            yield None
+            return
+
+        session = requests_cache.CachedSession(
+            cache_name=str(request.config.rootpath / ".pytest_weather_cache"),
+            backend="sqlite",
+            expire_after=86400,
+            allowable_methods=("GET",),
+            key_fn=_normalized_cache_key,
+        )
+        session.headers.update(adventure_agent._SESSION.headers)
+        for prefix, adapter in adventure_agent._SESSION.adapters.items():
+            session.mount(prefix, adapter)
+        mp.setattr(adventure_agent, "_SESSION", session)
+        try:
+            yield session
+        finally:
+            session.close()
+
+@pytest.fixture(scope="module")
+def chamonix_forecast(http_cache: Optional[requests_cache.CachedSession]) -> Dict[str, Any]:
+    """Fetches one live Chamonix forecast that runs past today, shared by the remote weather tests.
+
+    The range covers both the "historical data" and "clamp future end" cases, so the
+    whole remote weather class costs a single geocoding + archive round trip.
+    """
+    today = datetime.now(timezone.utc).date()
+    start = (today - timedelta(days=5)).isoformat()
+    end = (today + timedelta(days=2)).isoformat()
+    result = get_weather_forecast("Chamonix France", start, end)
+
+    try:
+        return json.loads(result)
+    except json.JSONDecodeError:
+        pytest.skip(f"Open-Meteo API unavailable: {result}")
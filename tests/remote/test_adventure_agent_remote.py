@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import pytest
+from datetime import datetime, timezone
+
+from adventure_agent import adventure_search, visit_webpage
+
+# Everything here talks to live services; run with `pytest --run-remote`
+pytestmark = pytest.mark.remote
+
+# visit_webpage reports failures as strings; str.startswith accepts a tuple of prefixes
+_FETCH_ERROR_PREFIXES = ("Error fetching the webpage", "An unexpected error")
+
+class TestAdventureSearchRemote:
+    """Tests adventure_search using the real DuckDuckGoSearchTool (no mocks)."""
+
+    def test_adventure_search_basic(self):
+        destination = "Chamonix"
+        activities = "hiking"
+        days = 3
+        expected_query = f"{destination} {activities} {days} day itinerary travel guide things to do"
+
+        result = adventure_search(destination, activities, days)
+
+        if result.startswith("Error performing adventure search"):
+            pytest.skip(f"Search backend unavailable: {result}")
+
+        assert f"Search results for '{expected_query}':" in result
+        assert destination in result
+
+class TestVisitWebpageRemote:
+    """Tests visit_webpage against real HTTP requests (no mocks)."""
+
+    def test_visit_webpage_success(self):
+        url = "https://example.com"
+        result = visit_webpage(url)
+
+        if result.startswith(_FETCH_ERROR_PREFIXES):
+            pytest.skip(f"Network/HTTP unavailable: {result}")
+
+        assert "Example Domain" in result
+
+    def test_visit_webpage_http_error(self):
+        # .invalid TLD is guaranteed to be invalid per RFC
+        bad_url = "https://nonexistent-domain-xyz.invalid"
+        result = visit_webpage(bad_url)
+        assert result.startswith(_FETCH_ERROR_PREFIXES)
+
+class TestWeatherForecastRemote:
+    """Test the get_weather_forecast tool against the live Open-Meteo API."""
+
+    def test_get_weather_forecast_success(self, chamonix_forecast):
+        assert chamonix_forecast['location'].startswith("Chamonix")
+        assert chamonix_forecast['data_type'] == 'historical'
+        assert len(chamonix_forecast['forecast']) >= 1
+        assert chamonix_forecast['forecast'][0]['temp_max'] is not None
+
+    def test_get_weather_forecast_clamps_future_end(self, chamonix_forecast):
+        today = datetime.now(timezone.utc).date()
+        resolved_range = chamonix_forecast['date_range']['resolved']
+        assert resolved_range['end_date'] == today.isoformat()